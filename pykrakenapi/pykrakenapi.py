@@ -26,14 +26,38 @@ For further information type
 
 """
 
+import copy
 import time
+import calendar
 import datetime
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
-import pandas as pd
-
 from requests import HTTPError
 
+# pandas and numpy are imported on first use, see _pd()
+pd = None
+np = None
+
+
+def _pd():
+    """Import pandas lazily and bind it to the module-level name ``pd``.
+
+    numpy, which pandas imports anyway, is bound to ``np`` at the same time.
+
+    """
+
+    global pd, np
+    if pd is None:
+        import numpy
+        import pandas
+        np = numpy
+        pd = pandas
+
+    return pd
+
 
 def crl_sleep(func):
     @wraps(func)
@@ -77,16 +101,17 @@ def callratelimiter(query_type):
 
             # public API, with an independent counter system
             if query_type == 'public':
-                if self.time_of_last_public_query is not None:
+                with self._lock:
                     now = datetime.datetime.now()
-                    lapse = (now - self.time_of_last_public_query).total_seconds()
-                    if lapse < 1.0:
-                        msg = "public call frequency exceeded (seconds={})"
-                        msg = msg.format(str(lapse))
-                        raise CallRateLimitError(msg)
-
-                now = datetime.datetime.now()
-                self.time_of_last_public_query = now
+                    if self.time_of_last_public_query is not None:
+                        lapse = (now - self.time_of_last_public_query
+                                 ).total_seconds()
+                        if lapse < 1.0:
+                            msg = "public call frequency exceeded (seconds={})"
+                            msg = msg.format(str(lapse))
+                            raise CallRateLimitError(msg)
+
+                    self.time_of_last_public_query = now
                 # no retries
                 if self.retry == 0:
                     result = func(*args, **kwargs)
@@ -114,31 +139,22 @@ def callratelimiter(query_type):
             elif query_type == 'other':
                 incr = 1
 
-            # decrease api counter
-            self._decrease_api_counter()
-
-            # return api call
-            if self.api_counter < self.limit:
-                # no retries
-                if self.retry == 0:
-                    self.api_counter += incr
+            # return api call while the limit allows it
+            attempt = 0
+            while self._reserve_call(incr):
+                try:
                     result = func(*args, **kwargs)
                     return result
-                # do retries
-                else:
-                    attempt = 0
-                    while self.api_counter < self.limit:
-                        try:
-                            self.api_counter += incr
-                            result = func(*args, **kwargs)
-                            return result
-                        except (HTTPError, KrakenAPIError) as err:
-                            print('attempt: {} |'.format(
-                                str(attempt).zfill(3)), err)
-                            attempt += 1
-                            time.sleep(self.retry)
-                            self._decrease_api_counter()
-                            continue
+                except (HTTPError, KrakenAPIError) as err:
+                    # no retries
+                    if self.retry == 0:
+                        raise
+                    # do retries
+                    print('attempt: {} |'.format(
+                        str(attempt).zfill(3)), err)
+                    attempt += 1
+                    time.sleep(self.retry)
+                    continue
 
             # raise error if limit exceeded
             msg = ("call rate limiter exceeded (counter={}, limit={})")
@@ -150,6 +166,50 @@ def callratelimiter(query_type):
     return decorate_func
 
 
+def ttl_cache(seconds):
+    def decorate_func(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """Time to live cache.
+
+            Return a copy of the result of an identical query made less than
+            ``seconds`` ago. Otherwise, query and cache the result, dropping
+            expired results of the same query.
+
+            """
+
+            self = args[0]
+            key = (func.__name__, args[1:], tuple(sorted(kwargs.items())))
+
+            try:
+                hash(key)
+            except TypeError:  # unhashable arguments, don't cache
+                return func(*args, **kwargs)
+
+            # the cache is shared by threads, the query itself runs unlocked
+            # (the call rate limiter takes the same lock)
+            with self._lock:
+                cached = self._cache.get(key)
+
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < seconds:
+                return copy.deepcopy(cached[1])
+
+            result = func(*args, **kwargs)
+
+            # drop expired results of this query before caching the new one
+            with self._lock:
+                for k, (t, _) in list(self._cache.items()):
+                    if k[0] == func.__name__ and now - t >= seconds:
+                        del self._cache[k]
+                self._cache[key] = (now, result)
+
+            return copy.deepcopy(result)
+
+        return wrapper
+    return decorate_func
+
+
 class KrakenAPIError(Exception):
     pass
 
@@ -158,6 +218,117 @@ class CallRateLimitError(Exception):
     pass
 
 
+def _check_error(res):
+    """Raise a KrakenAPIError if the response ``res`` reports errors."""
+
+    err = res['error']
+    if err:
+        raise KrakenAPIError(err)
+
+
+def _query_data(params):
+    """Return the request payload ``params`` without its None values."""
+
+    return {key: value for key, value in params.items() if value is not None}
+
+
+# maximum number of txids per QueryOrders/QueryTrades request
+_MAX_TXIDS = 20
+
+# start of unixtime (naive UTC)
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# columns and dtypes of ledger frames, see _ledger_frame ('str' is the dtype
+# pandas infers for text, i.e. object before pandas 3)
+_LEDGER_DTYPES = (
+    ('ledger_id', 'str'), ('refid', 'str'), ('time', 'int64'),
+    ('type', 'str'), ('subtype', 'str'), ('aclass', 'str'),
+    ('asset', 'str'), ('amount', 'float64'), ('fee', 'float64'),
+    ('balance', 'float64'),
+)
+_LEDGER_TEMPLATE = None
+
+
+def _single_col_df(asset, result):
+    """Return a single Kraken record as a one-column DataFrame.
+
+    The column is labeled ``asset`` and indexed by the record's fields. The
+    frame is built directly from a Series instead of transposing a one-row
+    DataFrame.
+
+    """
+
+    _pd()
+
+    # some endpoints wrap their record in a list
+    if isinstance(result, list):
+        if len(result) != 1:
+            return pd.DataFrame(index=[asset], data=result).T
+        result = result[0]
+
+    return pd.Series(result, name=asset).to_frame()
+
+
+def _ledger_frame(ledger):
+    """Return a dict of ledger entries as a DataFrame with typed columns.
+
+    The numeric fields are parsed straight into float64 arrays, in one
+    numpy conversion per column, instead of building an object-dtype frame
+    and casting it afterwards.
+
+    An empty ``ledger`` returns a zero-row copy of a template frame with the
+    final columns, dtypes and dtime index.
+
+    """
+
+    global _LEDGER_TEMPLATE
+    _pd()
+
+    if not ledger:
+        if _LEDGER_TEMPLATE is None:
+            _LEDGER_TEMPLATE = pd.DataFrame(
+                {col: pd.Series(dtype=dtype) for col, dtype in _LEDGER_DTYPES},
+                index=pd.DatetimeIndex([], dtype='datetime64[ns]',
+                                       name='dtime'))
+        return _LEDGER_TEMPLATE.copy()
+
+    records = list(ledger.values())
+
+    # fields missing from an entry are filled with NaN/None
+    columns = {'ledger_id': list(ledger)}
+    for key in dict.fromkeys(key for r in records for key in r):
+        if key in ('amount', 'balance', 'fee', 'time'):
+            columns[key] = np.array(
+                [r.get(key, np.nan) for r in records], dtype=np.float64)
+        else:
+            columns[key] = [r.get(key) for r in records]
+
+    return pd.DataFrame(columns)
+
+
+def _fee_frame(fees):
+    """Return a dict of fee tier info per pair as a float64 DataFrame.
+
+    Each pair's column is parsed straight into a float64 array, missing
+    (null) values become NaN.
+
+    """
+
+    _pd()
+
+    # fixed fee pairs omit some fields, e.g. minfee, maxfee and next*
+    fields = list(dict.fromkeys(f for info in fees.values() for f in info))
+    columns = {
+        pair: np.fromiter(
+            (np.nan if info.get(field) is None else float(info[field])
+             for field in fields),
+            dtype=np.float64, count=len(fields))
+        for pair, info in fees.items()
+    }
+
+    return pd.DataFrame(columns, index=fields)
+
+
 class KrakenAPI(object):
     """A python implementation of the Kraken API.
 
@@ -198,13 +369,18 @@ class KrakenAPI(object):
 
     """
 
+    __slots__ = ('api', 'time_of_last_public_query', 'time_of_last_query',
+                 'api_counter', 'limit', 'factor', 'retry', 'crl_sleep',
+                 '_lock', '_cache')
+
     def __init__(self, api, tier='Intermediate', retry=1, crl_sleep=5):
 
         self.api = api
 
-        # api call rate limiter
+        # api call rate limiter (shared by concurrent queries)
+        self._lock = threading.Lock()
         self.time_of_last_public_query = None
-        self.time_of_last_query = datetime.datetime.now()
+        self.time_of_last_query = time.monotonic()
 
         self.api_counter = 0
 
@@ -228,6 +404,9 @@ class KrakenAPI(object):
         self.retry = retry
         self.crl_sleep = crl_sleep
 
+        # results of slowly changing queries, see ttl_cache
+        self._cache = {}
+
     @crl_sleep
     @callratelimiter('public')
     def get_server_time(self):
@@ -260,10 +439,10 @@ class KrakenAPI(object):
         res = self.api.query_public('Time')
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # extract results
+        _pd()
         dt = pd.to_datetime(res['result']['rfc1123'])
         unixtime = res['result']['unixtime']
 
@@ -309,10 +488,10 @@ class KrakenAPI(object):
         res = self.api.query_public('SystemStatus')
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # extract results
+        _pd()
         status = res['result']['status']
         timestamp = pd.to_datetime(res['result']['timestamp'])
 
@@ -360,18 +539,17 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'info': info, 'aclass': aclass, 'asset': asset})
 
         # query
         res = self.api.query_public('Assets', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        assets = pd.DataFrame(res['result']).T
+        _pd()
+        assets = pd.DataFrame.from_dict(res['result'], orient='index')
 
         return assets
 
@@ -435,18 +613,17 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'info': info, 'pair': pair})
 
         # query
         res = self.api.query_public('AssetPairs', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        pairs = pd.DataFrame(res['result']).T
+        _pd()
+        pairs = pd.DataFrame.from_dict(res['result'], orient='index')
 
         return pairs
 
@@ -494,18 +671,17 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'pair': pair})
 
         # query
         res = self.api.query_public('Ticker', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        ticker = pd.DataFrame(res['result']).T
+        _pd()
+        ticker = pd.DataFrame.from_dict(res['result'], orient='index')
 
         return ticker
 
@@ -572,17 +748,18 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'pair': pair, 'interval': interval, 'since': since,
+        })
 
         # query
         res = self.api.query_public('OHLC', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
+        _pd()
         pair = list(res['result'].keys())[0]
         ohlc = pd.DataFrame(res['result'][pair])
         last = res['result']['last']
@@ -659,17 +836,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'pair': pair, 'count': count})
 
         # query
         res = self.api.query_public('Depth', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
+        _pd()
         asks = pd.DataFrame(res['result'][pair]['asks'])
         bids = pd.DataFrame(res['result'][pair]['bids'])
 
@@ -741,17 +917,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'pair': pair, 'since': since})
 
         # query
         res = self.api.query_public('Trades', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
+        _pd()
         pair = list(res['result'].keys())[0]
         trades = pd.DataFrame(res['result'][pair])
 
@@ -834,17 +1009,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'pair': pair, 'since': since})
 
         # query
         res = self.api.query_public('Spread', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
+        _pd()
         pair = list(res['result'].keys())[0]
         spread = pd.DataFrame(res['result'][pair])
 
@@ -901,18 +1075,17 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'otp': otp})
 
         # query
         res = self.api.query_private('Balance', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        balance = pd.DataFrame(index=['vol'], data=res['result']).T
+        _pd()
+        balance = _single_col_df('vol', res['result'])
 
         if not balance.empty:
             balance.loc[:, 'vol'] = balance.vol.astype(float)
@@ -971,18 +1144,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'aclass': aclass, 'asset': asset, 'otp': otp})
 
         # query
         res = self.api.query_private('TradeBalance', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        tradebalance = pd.DataFrame(index=[asset], data=res['result']).T
+        tradebalance = _single_col_df(asset, res['result'])
 
         if not tradebalance.empty:
             tradebalance.loc[:, asset] = tradebalance[asset].astype(float)
@@ -991,7 +1162,8 @@ class KrakenAPI(object):
 
     @crl_sleep
     @callratelimiter('other')
-    def get_open_orders(self, trades=False, userref=None, otp=None):
+    def get_open_orders(self, trades=False, userref=None, otp=None,
+                        as_frame=True):
         """
         Get open orders info.
 
@@ -1008,9 +1180,15 @@ class KrakenAPI(object):
         otp : str
             Two-factor password (if two-factor enabled, otherwise not required)
 
+        as_frame : bool, optional (default=True)
+            If set to False, skip the DataFrame construction and return the
+            raw result dictionary instead (fast path).
+
         Returns
         -------
-        open : pd.DataFrame
+        open : pd.DataFrame or dict
+            If ``as_frame=False``, the raw dict of order info keyed by order
+            txid instead.
             refid = Referral order transaction id that created this order
             userref = user reference id
             status = status of order:
@@ -1077,29 +1255,35 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'trades': trades, 'userref': userref, 'otp': otp})
 
         # query
         res = self.api.query_private('OpenOrders', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
+
+        # fast path, skip the dataframe
+        if not as_frame:
+            return res['result']['open']
 
         # create dataframe
-        open_orders = pd.DataFrame(res['result']['open']).T
+        _pd()
+        open_orders = pd.DataFrame.from_dict(
+            res['result']['open'], orient='index')
 
         if not open_orders.empty:
             descr = open_orders.descr.apply(pd.Series)
             descr.columns = ['descr_{}'.format(col) for col in descr.columns]
             del open_orders['descr']
-            open_orders = pd.concat((open_orders, descr), axis=1)
+            for col in descr.columns:
+                open_orders[col] = descr[col].to_numpy()
             for col in ['expiretm', 'opentm', 'starttm']:
                 open_orders.loc[:, col] = open_orders[col].astype(int)
-            for col in ['cost', 'fee', 'price', 'vol', 'vol_exec',
-                        'descr_price', 'descr_price2']:
-                open_orders.loc[:, col] = open_orders[col].astype(float)
+            numeric_cols = ['cost', 'fee', 'price', 'vol', 'vol_exec',
+                            'descr_price', 'descr_price2']
+            open_orders[numeric_cols] = open_orders[numeric_cols].apply(
+                pd.to_numeric).astype('float64')
         else:  # return empty dataframe with expected columns
             columns = [
                 "cost", "expiretm", "fee", "limitprice", "misc", "oflags", 
@@ -1115,7 +1299,8 @@ class KrakenAPI(object):
     @crl_sleep
     @callratelimiter('ledger/trade history')
     def get_closed_orders(self, trades=False, userref=None, start=None,
-                          end=None, ofs=None, closetime=None, otp=None):
+                          end=None, ofs=None, closetime=None, otp=None,
+                          as_frame=True):
         """Get closed orders info.
 
         Return a ``pd.DataFrame`` of closed orders info.
@@ -1144,12 +1329,18 @@ class KrakenAPI(object):
         otp : str
             Two-factor password (if two-factor enabled, otherwise not required)
 
+        as_frame : bool, optional (default=True)
+            If set to False, skip the DataFrame construction and return the
+            raw result dictionary instead (fast path).
+
         Returns
         -------
-        closed : pd.DataFrame
+        closed : pd.DataFrame or dict
             Array of order info.  See Get open orders.  Additional fields:
             closetm = unix timestamp of when order was closed
             reason = additional info on status (if any)
+            If ``as_frame=False``, the raw dict of order info keyed by order
+            txid instead.
 
         count :
             Amount of available order info matching criteria.
@@ -1173,18 +1364,25 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'trades': trades, 'userref': userref, 'start': start, 'end': end,
+            'ofs': ofs, 'closetime': closetime, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('ClosedOrders', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
+
+        # fast path, skip the dataframe
+        if not as_frame:
+            return res['result']['closed'], res['result']['count']
 
         # create dataframe
-        closed = pd.DataFrame(res['result']['closed']).T
+        _pd()
+        closed = pd.DataFrame.from_dict(
+            res['result']['closed'], orient='index')
 
         # count
         count = res['result']['count']
@@ -1194,18 +1392,19 @@ class KrakenAPI(object):
             descr = closed.descr.apply(pd.Series)
             descr.columns = ['descr_{}'.format(col) for col in descr.columns]
             del closed['descr']
-            closed = pd.concat((closed, descr), axis=1)
+            for col in descr.columns:
+                closed[col] = descr[col].to_numpy()
             for col in ['closetm', 'expiretm', 'opentm', 'starttm']:
                 closed.loc[:, col] = closed[col].astype(int)
-            for col in ['cost', 'fee', 'price', 'vol', 'vol_exec',
-                        'descr_price', 'descr_price2']:
-                closed.loc[:, col] = closed[col].astype(float)
+            numeric_cols = ['cost', 'fee', 'price', 'vol', 'vol_exec',
+                            'descr_price', 'descr_price2']
+            closed[numeric_cols] = closed[numeric_cols].apply(
+                pd.to_numeric).astype('float64')
 
         return closed, count
 
-    @crl_sleep
-    @callratelimiter('other')
-    def query_orders_info(self, txid, trades=False, userref=None, otp=None):
+    def query_orders_info(self, txid, trades=False, userref=None, otp=None,
+                          as_frame=True):
         """Query orders info.
 
         Return a ``pd.DataFrame`` of orders info.
@@ -1213,8 +1412,9 @@ class KrakenAPI(object):
         Parameters
         ----------
         txid : str
-            Comma delimited list of transaction ids to query info about
-            (20 maximum).
+            Comma delimited list of transaction ids to query info about. More
+            than 20 ids (the maximum per query) are split into several
+            queries.
 
         trades : bool, optional (default=False)
             Whether or not to include trades in output.
@@ -1225,10 +1425,16 @@ class KrakenAPI(object):
         otp : str
             Two-factor password (if two-factor enabled, otherwise not required)
 
+        as_frame : bool, optional (default=True)
+            If set to False, skip the DataFrame construction and return the
+            raw result dictionary instead (fast path).
+
         Returns
         -------
-        orders : pd.DataFrame
+        orders : pd.DataFrame or dict
             order_txid = order info.  See get_open_orders/get_closed_orders.
+            If ``as_frame=False``, the raw dict of order info keyed by order
+            txid instead.
 
         Raises
         ------
@@ -1243,39 +1449,74 @@ class KrakenAPI(object):
 
         """
 
+        # split into queries of at most 20 txids
+        txids = txid.split(',')
+        batches = [
+            self._query_orders_info(
+                ','.join(txids[i:i + _MAX_TXIDS]), trades=trades,
+                userref=userref, otp=otp, as_frame=as_frame)
+            for i in range(0, len(txids), _MAX_TXIDS)
+        ]
+
+        if len(batches) == 1:
+            return batches[0]
+
+        if not as_frame:
+            merged = {}
+            for batch in batches:
+                merged.update(batch)
+            return merged
+
+        _pd()
+        return pd.concat(batches)
+
+    @crl_sleep
+    @callratelimiter('other')
+    def _query_orders_info(self, txid, trades=False, userref=None, otp=None,
+                           as_frame=True):
+        """Query at most 20 txids, see ``query_orders_info``."""
+
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'txid': txid, 'trades': trades, 'userref': userref, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('QueryOrders', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
+
+        # fast path, skip the dataframe
+        if not as_frame:
+            return res['result']
 
         # create dataframe
-        orders = pd.DataFrame(res['result']).T
+        _pd()
+        orders = pd.DataFrame.from_dict(res['result'], orient='index')
 
         if not orders.empty:
 
             descr = orders.descr.apply(pd.Series)
             descr.columns = ['descr_{}'.format(col) for col in descr.columns]
             del orders['descr']
-            orders = pd.concat((orders, descr), axis=1)
-            for col in ['closetm', 'expiretm', 'opentm', 'starttm']:
-                if col in orders:
-                    orders.loc[:, col] = orders[col].astype(float)
-            for col in ['cost', 'fee', 'price', 'vol', 'vol_exec',
-                        'descr_price', 'descr_price2']:
-                orders.loc[:, col] = orders[col].astype(float)
+            for col in descr.columns:
+                orders[col] = descr[col].to_numpy()
+            numeric_cols = [
+                col for col in ['closetm', 'expiretm', 'opentm', 'starttm']
+                if col in orders
+            ] + ['cost', 'fee', 'price', 'vol', 'vol_exec', 'descr_price',
+                 'descr_price2']
+            orders[numeric_cols] = orders[numeric_cols].apply(
+                pd.to_numeric).astype('float64')
 
         return orders
 
     @crl_sleep
     @callratelimiter('ledger/trade history')
     def get_trades_history(self, type='all', trades=False, start=None,
-                           end=None, ofs=None, otp=None, ascending=False):
+                           end=None, ofs=None, otp=None, ascending=False,
+                           as_frame=True):
         """Get trades history.
 
         Return a ``pd.DataFrame`` of the trade history.
@@ -1311,9 +1552,15 @@ class KrakenAPI(object):
             date in the last position. When set to False, the most recent date
             is in the first position.
 
+        as_frame : bool, optional (default=True)
+            If set to False, skip the DataFrame construction and return the
+            raw result dictionary instead (fast path).
+
         Returns
         -------
-        trades : pd.DataFrame
+        trades : pd.DataFrame or dict
+            If ``as_frame=False``, the raw dict of trade info keyed by trade
+            txid instead.
             index = datetime
             txid = trade txid
             ordertxid = order responsible for execution of trade
@@ -1368,18 +1615,25 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'type': type, 'trades': trades, 'start': start, 'end': end,
+            'ofs': ofs, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('TradesHistory', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
+
+        # fast path, skip the dataframe
+        if not as_frame:
+            return res['result']['trades'], res['result']['count']
 
         # create dataframe
-        trades = pd.DataFrame(res['result']['trades']).T
+        _pd()
+        trades = pd.DataFrame.from_dict(
+            res['result']['trades'], orient='index')
 
         # count
         count = res['result']['count']
@@ -1389,14 +1643,17 @@ class KrakenAPI(object):
             trades.index.name = 'txid'
             trades.reset_index(inplace=True)
 
-            # append datetime, sort by it
-            trades['dtime'] = pd.to_datetime(trades.time, unit='s')
+            # append datetime (parsing time only once), sort by it
+            time_f = pd.to_numeric(trades['time'])
+            trades['time'] = time_f
+            trades['dtime'] = pd.to_datetime(time_f, unit='s', cache=True)
             trades.sort_values('dtime', ascending=ascending, inplace=True)
             trades.set_index('dtime', inplace=True)
 
             # set dtypes
-            for col in ['cost', 'fee', 'margin', 'price', 'time', 'vol']:
-                trades.loc[:, col] = trades[col].astype(float)
+            numeric_cols = ['cost', 'fee', 'margin', 'price', 'vol']
+            trades[numeric_cols] = trades[numeric_cols].apply(
+                pd.to_numeric).astype('float64')
 
         return trades, count
 
@@ -1439,18 +1696,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'asset': asset, 'otp': otp})
 
         # query
         res = self.api.query_private('DepositMethods', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        depositmethods = pd.DataFrame(index=[asset], data=res['result']).T
+        depositmethods = _single_col_df(asset, res['result'])
 
         return depositmethods
 
@@ -1497,18 +1752,18 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'asset': asset, 'method': method, 'new': new, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('DepositAddresses', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        depositaddresses = pd.DataFrame(index=[asset], data=res['result']).T
+        depositaddresses = _single_col_df(asset, res['result'])
 
         return depositaddresses
 
@@ -1562,18 +1817,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'asset': asset, 'method': method, 'otp': otp})
 
         # query
         res = self.api.query_private('DepositStatus', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        depositstatus = pd.DataFrame(index=[asset], data=res['result']).T
+        depositstatus = _single_col_df(asset, res['result'])
 
         return depositstatus
 
@@ -1621,18 +1874,18 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items()
-                if arg != 'self' and value is not None}
+        data = _query_data({
+            'key': key, 'asset': asset, 'amount': amount, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('WithdrawInfo', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        withdrawal_info = pd.DataFrame(index=[asset], data=res['result']).T
+        withdrawal_info = _single_col_df(asset, res['result'])
 
         return withdrawal_info
 
@@ -1676,15 +1929,15 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items()
-                if arg != 'self' and value is not None}
+        data = _query_data({
+            'key': key, 'asset': asset, 'amount': amount, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Withdraw', data=data)
 
         # check for error
-        if len(res["error"]) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']
 
@@ -1741,18 +1994,16 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items()
-                if arg != 'self' and value is not None}
+        data = _query_data({'asset': asset, 'method': method, 'otp': otp})
 
         # query
         res = self.api.query_private('WithdrawStatus', data=data)
 
         # check for error
-        if len(res["error"]) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        withdrawalstatus = pd.DataFrame(index=[asset], data=res['result']).T
+        withdrawalstatus = _single_col_df(asset, res['result'])
 
         return withdrawalstatus
 
@@ -1793,21 +2044,18 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items()
-                if arg != 'self' and value is not None}
+        data = _query_data({'asset': asset, 'refid': refid, 'otp': otp})
 
         # query
         res = self.api.query_private('WithdrawCancel', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']
 
-    @crl_sleep
-    @callratelimiter('ledger/trade history')
-    def query_trades_info(self, txid, trades=False, otp=None, ascending=False):
+    def query_trades_info(self, txid, trades=False, otp=None, ascending=False,
+                          as_frame=True):
         """Query trades info.
 
         Return a ``pd.DataFrame`` of trades info.
@@ -1815,8 +2063,9 @@ class KrakenAPI(object):
         Parameters
         ----------
         txid : str
-            Comma delimited list of transaction ids to query info about
-            (20 maximum).
+            Comma delimited list of transaction ids to query info about. More
+            than 20 ids (the maximum per query) are split into several
+            queries.
 
         trades : bool, optional (default=False)
             Whether or not to include trades related to position in output.
@@ -1829,10 +2078,15 @@ class KrakenAPI(object):
             date in the last position. When set to False, the most recent date
             is in the first position.
 
+        as_frame : bool, optional (default=True)
+            If set to False, skip the DataFrame construction and return the
+            raw result dictionary instead (fast path).
+
         Returns
         -------
-        trades : pd.DataFrame
-            See get_trades_history.
+        trades : pd.DataFrame or dict
+            See get_trades_history. If ``as_frame=False``, the raw dict of
+            trade info keyed by trade txid instead.
 
         Raises
         ------
@@ -1847,33 +2101,66 @@ class KrakenAPI(object):
 
         """
 
+        # split into queries of at most 20 txids
+        txids = txid.split(',')
+        batches = [
+            self._query_trades_info(
+                ','.join(txids[i:i + _MAX_TXIDS]), trades=trades, otp=otp,
+                ascending=ascending, as_frame=as_frame)
+            for i in range(0, len(txids), _MAX_TXIDS)
+        ]
+
+        if len(batches) == 1:
+            return batches[0]
+
+        if not as_frame:
+            merged = {}
+            for batch in batches:
+                merged.update(batch)
+            return merged
+
+        _pd()
+        return pd.concat(batches).sort_index(ascending=ascending)
+
+    @crl_sleep
+    @callratelimiter('ledger/trade history')
+    def _query_trades_info(self, txid, trades=False, otp=None,
+                           ascending=False, as_frame=True):
+        """Query at most 20 txids, see ``query_trades_info``."""
+
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'txid': txid, 'trades': trades, 'otp': otp})
 
         # query
         res = self.api.query_private('QueryTrades', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
+
+        # fast path, skip the dataframe
+        if not as_frame:
+            return res['result']
 
         # create dataframe
-        trades = pd.DataFrame(res['result']).T
+        _pd()
+        trades = pd.DataFrame.from_dict(res['result'], orient='index')
 
         if not trades.empty:
 
             trades.index.name = 'txid'
             trades.reset_index(inplace=True)
 
-            # append datetime, sort by it
-            trades['dtime'] = pd.to_datetime(trades.time, unit='s')
+            # append datetime (parsing time only once), sort by it
+            time_f = pd.to_numeric(trades['time'])
+            trades['time'] = time_f
+            trades['dtime'] = pd.to_datetime(time_f, unit='s', cache=True)
             trades.sort_values('dtime', ascending=ascending, inplace=True)
             trades.set_index('dtime', inplace=True)
 
             # set dtypes
-            for col in ['cost', 'fee', 'margin', 'price', 'time', 'vol']:
-                trades.loc[:, col] = trades[col].astype(float)
+            numeric_cols = ['cost', 'fee', 'margin', 'price', 'vol']
+            trades[numeric_cols] = trades[numeric_cols].apply(
+                pd.to_numeric).astype('float64')
 
         return trades
 
@@ -1938,15 +2225,13 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'txid': txid, 'docalcs': docalcs, 'otp': otp})
 
         # query
         res = self.api.query_private('OpenPositions', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
         openpositions = res['result']
@@ -2025,36 +2310,35 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'aclass': aclass, 'asset': asset, 'type': type, 'start': start,
+            'end': end, 'ofs': ofs, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Ledgers', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        ledgers = pd.DataFrame(res['result']['ledger']).T
+        _pd()
+        ledgers = _ledger_frame(res['result']['ledger'])
 
         # count
         count = res['result']['count']
 
         if not ledgers.empty:
 
-            ledgers.index.name = 'ledger_id'
-            ledgers.reset_index(inplace=True)
-
-            # append datetime, sort by it
-            ledgers['dtime'] = pd.to_datetime(ledgers.time, unit='s')
-            ledgers.sort_values('dtime', ascending=ascending, inplace=True)
-            ledgers.set_index('dtime', inplace=True)
+            # sort by time, then index by datetime (a plain nanosecond view)
+            ledgers.sort_values('time', ascending=ascending, inplace=True,
+                                kind='stable')
+            nanoseconds = (ledgers['time'].to_numpy() * 1e9).astype(np.int64)
+            ledgers.index = pd.DatetimeIndex(
+                nanoseconds.view('datetime64[ns]'), name='dtime')
 
             # dtypes
-            for col in ['amount', 'balance', 'fee']:
-                ledgers.loc[:, col] = ledgers[col].astype(float)
-            ledgers.loc[:, 'time'] = ledgers.time.astype(int)
+            ledgers['time'] = ledgers['time'].astype('int64')
 
         return ledgers, count
 
@@ -2098,33 +2382,94 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'id': id, 'otp': otp})
 
         # query
         res = self.api.query_private('QueryLedgers', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
-        ledgers = pd.DataFrame(res['result']).T
+        _pd()
+        ledgers = _ledger_frame(res['result'])
 
         if not ledgers.empty:
 
-            ledgers.index.name = 'ledger_id'
-            ledgers.reset_index(inplace=True)
-
-            # append datetime, sort by it
-            ledgers['dtime'] = pd.to_datetime(ledgers.time, unit='s')
-            ledgers.sort_values('dtime', ascending=ascending, inplace=True)
-            ledgers.set_index('dtime', inplace=True)
+            # sort by time, then index by datetime (a plain nanosecond view)
+            ledgers.sort_values('time', ascending=ascending, inplace=True,
+                                kind='stable')
+            nanoseconds = (ledgers['time'].to_numpy() * 1e9).astype(np.int64)
+            ledgers.index = pd.DatetimeIndex(
+                nanoseconds.view('datetime64[ns]'), name='dtime')
 
             # dtypes
-            for col in ['amount', 'balance', 'fee']:
-                ledgers.loc[:, col] = ledgers[col].astype(float)
-            ledgers.loc[:, 'time'] = ledgers.time.astype(int)
+            ledgers['time'] = ledgers['time'].astype('int64')
+
+        return ledgers
+
+    def get_all_ledgers(self, aclass=None, asset=None, type='all', start=None,
+                        end=None, otp=None, ascending=False, max_workers=1):
+        """Get all ledgers info matching the criteria.
+
+        Return a ``pd.DataFrame`` of all ledgers info, paginating through
+        ``get_ledgers_info``. After the first page, the remaining pages are
+        queried in a pool of ``max_workers`` threads.
+
+        Parameters
+        ----------
+        aclass, asset, type, start, end, otp, ascending
+            See get_ledgers_info.
+
+        max_workers : int, optional (default=1)
+            Maximum number of concurrent queries. Each query still passes the
+            call rate limiter. krakenex uses the current time in milliseconds
+            as nonce, so concurrent queries can arrive with equal or
+            decreasing nonces. Only use values above 1 if a nonce window is
+            configured for the API key, otherwise queries fail with
+            'EAPI:Invalid nonce'.
+
+        Returns
+        -------
+        ledgers : pd.DataFrame
+            See get_ledgers_info.
+
+        Raises
+        ------
+        HTTPError
+            An HTTP error occurred.
+
+        KrakenAPIError
+            A kraken.com API error occurred.
+
+        CallRateLimitError
+            The call rate limiter blocked the query.
+
+        """
+
+        kwargs = {'aclass': aclass, 'asset': asset, 'type': type,
+                  'start': start, 'end': end, 'otp': otp,
+                  'ascending': ascending}
+
+        # first page, gives the page size and the total count
+        ledgers, count = self.get_ledgers_info(**kwargs)
+        page = len(ledgers)
+        if page == 0 or page >= count:
+            return ledgers
+
+        # remaining pages
+        def get_page(ofs):
+            return self.get_ledgers_info(ofs=ofs, **kwargs)[0]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = list(executor.map(get_page, range(page, count, page)))
+
+        _pd()
+        ledgers = pd.concat([ledgers] + pages)
+
+        # entries added while paging shift the offsets, drop duplicates
+        ledgers = ledgers[~ledgers['ledger_id'].duplicated()]
+        ledgers = ledgers.sort_index(ascending=ascending)
 
         return ledgers
 
@@ -2200,32 +2545,24 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'pair': pair, 'fee_info': fee_info, 'otp': otp})
 
         # query
         res = self.api.query_private('TradeVolume', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         # create dataframe
         volume = float(res['result']['volume'])
 
-        # fees
-        try:
-            fees = pd.DataFrame(res['result']['fees'])
-            for col in fees.columns:
-                fees.loc[:, col] = fees[col].astype(float)
-        except KeyError:
-            fees = None
-        try:
-            fees_maker = pd.DataFrame(res['result']['fees_maker'])
-            for col in fees_maker.columns:
-                fees_maker.loc[:, col] = fees_maker[col].astype(float)
-        except KeyError:
-            fees_maker = None
+        # fees (if requested)
+        fees = fees_maker = None
+        if fee_info:
+            fees = res['result'].get('fees')
+            fees = _fee_frame(fees) if fees else None
+            fees_maker = res['result'].get('fees_maker')
+            fees_maker = _fee_frame(fees_maker) if fees_maker else None
 
         # currency
         currency = res['result']['currency']
@@ -2399,25 +2736,21 @@ class KrakenAPI(object):
         # create data dictionary
         if validate is False:
             validate = None
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
-
-        # This little hack fixes the problem with [ ]
-        if "close_ordertype" in data:
-            data["close[ordertype]"] = data.pop("close_ordertype")
-
-        if "close_price" in data:
-            data["close[price]"] = data.pop("close_price")
-
-        if "close_price2" in data:
-            data["close[price2]"] = data.pop("close_price2")
+        data = _query_data({
+            'ordertype': ordertype, 'type': type, 'pair': pair,
+            'userref': userref, 'volume': volume, 'price': price,
+            'price2': price2, 'trigger': trigger, 'leverage': leverage,
+            'oflags': oflags, 'timeinforce': timeinforce, 'starttm': starttm,
+            'expiretm': expiretm, 'close[ordertype]': close_ordertype,
+            'close[price]': close_price, 'close[price2]': close_price2,
+            'deadline': deadline, 'validate': validate, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('AddOrder', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']
 
@@ -2457,15 +2790,13 @@ class KrakenAPI(object):
         """
 
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'txid': txid, 'otp': otp})
 
         # submit
         res = self.api.query_private('CancelOrder', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']
 
@@ -2484,11 +2815,32 @@ class KrakenAPI(object):
 
         """
 
-        delta_t = (dt - datetime.datetime(1970, 1, 1)).total_seconds()
-        unixtime = int(delta_t)
+        unixtime = calendar.timegm(dt.utctimetuple())
 
         return unixtime
 
+    def datetimes_to_unixtime(self, dts):
+        """Return unixtimes for an array-like of datetimes.
+
+        Vectorized version of ``datetime_to_unixtime``.
+
+        Parameters
+        ----------
+        dts : array-like of datetime.datetime or numpy.datetime64
+            The (UTC) datetimes to convert to unixtime.
+
+        Returns
+        -------
+        unixtimes : numpy.ndarray
+            The unixtimes (int64) corresponding to the given datetimes.
+
+        """
+
+        _pd()
+        unixtimes = np.asarray(dts, dtype='datetime64[s]').astype(np.int64)
+
+        return unixtimes
+
     def unixtime_to_datetime(self, unixtime):
         """Return datetime (UTC) for a given unixtime.
 
@@ -2504,20 +2856,29 @@ class KrakenAPI(object):
 
         """
 
-        dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(0, unixtime)
+        dt = _EPOCH + datetime.timedelta(seconds=unixtime)
 
         return dt
 
+    def _reserve_call(self, incr):
+
+        # decrease api counter, count the call if the limit allows it
+        with self._lock:
+            self._decrease_api_counter()
+            if self.api_counter < self.limit:
+                self.api_counter += incr
+                return True
+            return False
+
     def _decrease_api_counter(self):
 
-        # decrease api counter, update time of last query
-        now = datetime.datetime.now()
-        decr = int((now - self.time_of_last_query).seconds / self.factor)
-        self.api_counter -= decr
-        if self.api_counter < 0:
-            self.api_counter = 0
-        self.time_of_last_query = now
+        # decrease api counter, keep the time left over for the next decrease
+        now = time.monotonic()
+        decr = int((now - self.time_of_last_query) / self.factor)
+        self.api_counter = max(0, self.api_counter - decr)
+        self.time_of_last_query += decr * self.factor
     
+    @ttl_cache(300)
     @crl_sleep
     @callratelimiter('other')
     def get_earn_strategies(self, ascending=None, asset=None, cursor=None, 
@@ -2532,6 +2893,8 @@ class KrakenAPI(object):
         Intermediate tier. Get your account verified to access earn.
         https://docs.kraken.com/rest/#tag/Earn/operation/listStrategies
 
+        Results are cached for 5 minutes per set of arguments.
+
 
         Parameters
         ----------
@@ -2583,16 +2946,18 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
         """
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'ascending': ascending, 'asset': asset, 'cursor': cursor,
+            'limit': limit, 'lock_type': lock_type, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Earn/Strategies', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
+        _pd()
         return (
             res['result']['next_cursor'], 
             pd.DataFrame(res['result']['items']).set_index('id')
@@ -2665,23 +3030,27 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
         """
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'ascending': ascending, 'converted_asset': converted_asset,
+            'hide_zero_allocations': hide_zero_allocations, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Earn/Allocations', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
         
+        _pd()
         items = pd.json_normalize(
             res['result']['items']).set_index('strategy_id')
         numeric_cols = [
             x for x in items.columns if x.endswith(('native','converted'))]
         items[numeric_cols] = items[numeric_cols].apply(pd.to_numeric)
         
-        date_cols = ['payout.period_start', 'payout.period_end']
+        date_cols = [
+            x for x in ['payout.period_start', 'payout.period_end']
+            if x in items.columns]
         items[date_cols] = items[date_cols].apply(pd.to_datetime)
 
         return (
@@ -2734,15 +3103,13 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
         """
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'strategy_id': strategy_id, 'otp': otp})
 
         # query
         res = self.api.query_private('Earn/AllocateStatus', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']['pending']
 
@@ -2778,15 +3145,13 @@ class KrakenAPI(object):
         CallRateLimitError
             The call rate limiter blocked the query.
         """
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'strategy_id': strategy_id, 'otp': otp})
 
         # query
         res = self.api.query_private('Earn/DeallocateStatus', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
         
         return res['result']['pending']
 
@@ -2828,15 +3193,15 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
         """
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'amount': amount, 'strategy_id': strategy_id, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Earn/Allocate', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
         
         return res['result']
         
@@ -2879,22 +3244,22 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
         """
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({
+            'amount': amount, 'strategy_id': strategy_id, 'otp': otp,
+        })
 
         # query
         res = self.api.query_private('Earn/Deallocate', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
         
         return res['result']
 
 
     @crl_sleep
     @callratelimiter('other')
-    def get_websockets_token(self, opt=None):
+    def get_websockets_token(self, otp=None, opt=None):
         """An authentication token must be requested via this REST API endpoint
         in order to connect to and authenticate with our Websockets API. The
         token should be used within 15 minutes of creation, but it does not
@@ -2911,6 +3276,9 @@ class KrakenAPI(object):
         otp : str
             Two-factor password (if two-factor enabled, otherwise not required)
 
+        opt : str
+            Deprecated alias of ``otp``.
+
         Returns
         -------
         token: str
@@ -2930,15 +3298,20 @@ class KrakenAPI(object):
             The call rate limiter blocked the query.
 
         """
+        # deprecated alias of otp
+        if opt is not None:
+            warnings.warn("'opt' is deprecated, use 'otp' instead",
+                          DeprecationWarning, stacklevel=4)
+            if otp is None:
+                otp = opt
+
         # create data dictionary
-        data = {arg: value for arg, value in locals().items() if
-                arg != 'self' and value is not None}
+        data = _query_data({'otp': otp})
 
         # query
         res = self.api.query_private('GetWebSocketsToken', data=data)
 
         # check for error
-        if len(res['error']) > 0:
-            raise KrakenAPIError(res['error'])
+        _check_error(res)
 
         return res['result']
@@ -12,14 +12,20 @@ downloading/updating trade data. Data is stored as a pandas.DataFrame (in
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import os
 from pathlib import Path
 import pytz
 
+import numpy as np
 import pandas as pd
 import krakenex
 from pykrakenapi import KrakenAPI
 
+# fixed categories, so that chunks concatenate without becoming object columns
+BUY_SELL = pd.CategoricalDtype(['buy', 'sell'])
+MARKET_LIMIT = pd.CategoricalDtype(['limit', 'market'])
+
 
 class GetTradeData(object):
 
@@ -42,20 +48,18 @@ class GetTradeData(object):
         folder = self.folder + self.pair + '/'
 
         # update or new download?
-        if since is 0:
-            fs = os.listdir(folder)
-            if len(fs) > 0:
-                fs.sort()
-                last = int(fs[-1].split('.')[0])
-            else:
-                last = 0
+        since = int(since)
+        if since == 0:
+            last = max((int(e.name.split('.', 1)[0])
+                        for e in os.scandir(folder)
+                        if e.name.endswith('.pickle')), default=0)
         else:
             last = since
 
         # get data
         while True:
             try:
-                fname = folder + '{}.pickle'.format(str(last).zfill(19))
+                fname = '{}{:019d}.pickle'.format(folder, last)
                 trades, last = self.k.get_recent_trades(pair=self.pair,
                                                         since=last)
 
@@ -63,6 +67,10 @@ class GetTradeData(object):
                 index = trades.index.tz_localize(pytz.utc).tz_convert(self.tz)
                 trades.index = index
 
+                # store labels as categoricals
+                trades = trades.astype({'buy_sell': BUY_SELL,
+                                        'market_limit': MARKET_LIMIT})
+
                 # store
                 print('storing', fname)
                 trades.to_pickle(fname)
@@ -81,33 +89,42 @@ class GetTradeData(object):
         if since > 0:
             fs = [f for f in fs if int(f.split('.')[0]) >= since*1e9]
 
-        trades = []
-        for f in fs:
-            trades.append(pd.read_pickle(folder + f))
-        trades = pd.concat(trades, axis=0)
-        trades.loc[:, 'cost'] = trades.price * trades.volume
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            trades = pd.concat(
+                ex.map(pd.read_pickle, (folder + f for f in fs)), axis=0,
+                sort=False)
+        trades = trades.astype({'buy_sell': BUY_SELL,
+                                'market_limit': MARKET_LIMIT,
+                                'misc': 'category'})
+        trades['cost'] = (trades['price'].to_numpy() *
+                          trades['volume'].to_numpy())
 
         # store on disc
         fname = self.folder + self.pair + '_trades.pickle'
         print('\n storing', fname)
         trades.to_pickle(fname)
 
-        # resample
-        gtrades = trades.resample('{}min'.format(interval))
-
-        # ohlc, volume
-        ohlc = gtrades.price.ohlc()
-        ohlc.loc[:, 'volume'] = gtrades.volume.sum()
-        ohlc.volume.fillna(0, inplace=True)
-        closes = ohlc.close.fillna(method='pad')
-        ohlc = ohlc.apply(lambda x: x.fillna(closes))
-
-        # vwap
-        ohlc.loc[:, 'vwap'] = gtrades.cost.sum() / ohlc.volume
-        ohlc.vwap.fillna(ohlc.close, inplace=True)
-
-        # count
-        ohlc.loc[:, 'count'] = gtrades.size()
+        # resample, aggregating ohlc, volume, cost and count in one pass
+        gtrades = trades.groupby(pd.Grouper(freq='{}min'.format(interval)))
+        ohlc = gtrades.agg(
+            open=('price', 'first'), high=('price', 'max'),
+            low=('price', 'min'), close=('price', 'last'),
+            volume=('volume', 'sum'), cost=('cost', 'sum'),
+            count=('price', 'size'))
+
+        # empty intervals get the last close
+        closes = ohlc.close.ffill()
+        ohlc = ohlc.fillna(
+            {col: closes for col in ['open', 'high', 'low', 'close']})
+
+        # vwap (the close for intervals without volume)
+        cost = ohlc.pop('cost').to_numpy()
+        volume = ohlc.volume.to_numpy()
+        ohlc['vwap'] = np.divide(cost, volume,
+                                 out=ohlc.close.to_numpy(copy=True),
+                                 where=volume > 0)
+        ohlc = ohlc[['open', 'high', 'low', 'close', 'volume', 'vwap',
+                     'count']]
 
         # store on disc
         fname = self.folder + self.pair + '_{}.pickle'.format(interval)
@@ -153,7 +170,7 @@ if __name__ == "__main__":
               " function was not called before, retrieve from earliest time"
               " possible. When aggregating (interval>0), aggregate from"
               " ``since`` onwards (unixtime)."),
-        type=str,
+        type=int,
         default=0)
 
     parser.add_argument(
@@ -2,9 +2,47 @@ import unittest
 from pykrakenapi.pykrakenapi import *
 
 import krakenex as k
+import threading
 import time
 
 
+class StubAPI(object):
+    """Offline stand-in for krakenex.API.
+
+    Answers private queries with ``results(method, data)`` and records the
+    queries made.
+
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def query_private(self, method, data=None):
+        with self._lock:
+            self.queries.append((method, data))
+        return {'error': [], 'result': self.results(method, data)}
+
+
+def order_info(i):
+    return {'refid': None, 'userref': 0, 'status': 'closed',
+            'opentm': 1500000000.0 + i, 'starttm': 0, 'expiretm': 0,
+            'closetm': 1500000001.0 + i,
+            'descr': {'pair': 'XBTEUR', 'type': 'buy', 'ordertype': 'limit',
+                      'price': '1.0', 'price2': '0', 'leverage': 'none',
+                      'order': 'buy 1.0 XBTEUR @ limit 1.0', 'close': ''},
+            'vol': '1.0', 'vol_exec': '1.0', 'cost': '1.0', 'fee': '0.0',
+            'price': '1.0', 'misc': '', 'oflags': 'fciq'}
+
+
+def trade_info(i):
+    return {'ordertxid': 'O{}'.format(i), 'pair': 'XXBTZEUR',
+            'time': 1500000000.0 + i, 'type': 'buy', 'ordertype': 'limit',
+            'price': '1.0', 'cost': '1.0', 'fee': '0.0', 'vol': '1.0',
+            'margin': '0.0'}
+
+
 class TestPykrakenapi(unittest.TestCase):
     def test_public_callratelimiter(self):
         raw_api = k.API()
@@ -25,5 +63,214 @@ class TestPykrakenapi(unittest.TestCase):
             dt, ut = pyApi.get_server_time()
 
 
+class TestAsFrame(unittest.TestCase):
+    def setUp(self):
+        orders = {'O{}'.format(i): order_info(i) for i in range(3)}
+        trades = {'T{}'.format(i): trade_info(i) for i in range(3)}
+
+        def results(method, data):
+            if method == 'OpenOrders':
+                return {'open': orders}
+            if method == 'ClosedOrders':
+                return {'closed': orders, 'count': 3}
+            if method == 'TradesHistory':
+                return {'trades': trades, 'count': 3}
+
+        self.orders = orders
+        self.trades = trades
+        self.k = KrakenAPI(StubAPI(results), crl_sleep=0)
+
+    def test_open_orders(self):
+        self.assertEqual(self.k.get_open_orders(as_frame=False), self.orders)
+        open_orders = self.k.get_open_orders()
+        self.assertEqual(sorted(open_orders.index), sorted(self.orders))
+
+    def test_closed_orders(self):
+        closed, count = self.k.get_closed_orders(as_frame=False)
+        self.assertEqual(closed, self.orders)
+        self.assertEqual(count, 3)
+
+    def test_trades_history(self):
+        trades, count = self.k.get_trades_history(as_frame=False)
+        self.assertEqual(trades, self.trades)
+        self.assertEqual(count, 3)
+        trades, count = self.k.get_trades_history()
+        self.assertEqual(sorted(trades.txid), sorted(self.trades))
+
+
+class TestQueryTxids(unittest.TestCase):
+    def setUp(self):
+        def results(method, data):
+            txids = data['txid'].split(',')
+            info = order_info if method == 'QueryOrders' else trade_info
+            return {txid: info(int(txid[1:])) for txid in txids}
+
+        self.api = StubAPI(results)
+        self.k = KrakenAPI(self.api, crl_sleep=0)
+
+    def batch_sizes(self):
+        return [len(data['txid'].split(',')) for _, data in self.api.queries]
+
+    def test_orders_single_query(self):
+        txid = ','.join('O{}'.format(i) for i in range(20))
+        orders = self.k.query_orders_info(txid)
+        self.assertEqual(self.batch_sizes(), [20])
+        self.assertEqual(len(orders), 20)
+        for col in ['starttm', 'descr_price', 'descr_price2']:
+            self.assertEqual(orders[col].dtype, 'float64')
+
+    def test_orders_batches(self):
+        txids = ['O{}'.format(i) for i in range(45)]
+        orders = self.k.query_orders_info(','.join(txids))
+        self.assertEqual(self.batch_sizes(), [20, 20, 5])
+        self.assertEqual(list(orders.index), txids)
+
+    def test_orders_batches_dict(self):
+        txids = ['O{}'.format(i) for i in range(45)]
+        orders = self.k.query_orders_info(','.join(txids), as_frame=False)
+        self.assertEqual(self.batch_sizes(), [20, 20, 5])
+        self.assertEqual(sorted(orders), sorted(txids))
+
+    def test_trades_batches(self):
+        txids = ['T{}'.format(i) for i in range(45)]
+        trades = self.k.query_trades_info(','.join(txids))
+        self.assertEqual(self.batch_sizes(), [20, 20, 5])
+        self.assertEqual(sorted(trades.txid), sorted(txids))
+        self.assertTrue(trades.index.is_monotonic_decreasing)
+
+        trades = self.k.query_trades_info(','.join(txids), ascending=True)
+        self.assertTrue(trades.index.is_monotonic_increasing)
+
+    def test_trades_batches_dict(self):
+        txids = ['T{}'.format(i) for i in range(45)]
+        trades = self.k.query_trades_info(','.join(txids), as_frame=False)
+        self.assertEqual(self.batch_sizes(), [20, 20, 5])
+        self.assertEqual(sorted(trades), sorted(txids))
+
+
+class TestGetAllLedgers(unittest.TestCase):
+    def setUp(self):
+        # 10 entries, served newest first in pages of 3
+        self.ledger = ledger = [
+            ('L{}'.format(i), {
+                'refid': 'R{}'.format(i), 'time': 1500000000.5 + i,
+                'type': 'trade', 'subtype': '', 'aclass': 'currency',
+                'asset': 'ZEUR', 'amount': '1.0', 'fee': '0.0',
+                'balance': str(i)})
+            for i in reversed(range(10))
+        ]
+
+        def results(method, data):
+            ofs = data.get('ofs', 0)
+            return {'ledger': dict(ledger[ofs:ofs + 3]), 'count': 10}
+
+        self.api = StubAPI(results)
+
+    def test_offsets(self):
+        k = KrakenAPI(self.api, crl_sleep=0)
+        ledgers = k.get_all_ledgers()
+        offsets = sorted(data.get('ofs', 0) for _, data in self.api.queries)
+        self.assertEqual(offsets, [0, 3, 6, 9])
+        self.assertEqual(len(ledgers), 10)
+        self.assertTrue(ledgers.index.is_monotonic_decreasing)
+
+        ledgers = k.get_all_ledgers(ascending=True)
+        self.assertTrue(ledgers.index.is_monotonic_increasing)
+
+    def test_concurrent_rate_limit(self):
+        # workers retry faster than the counter decreases by one
+        k = KrakenAPI(self.api, tier='Pro', crl_sleep=.01)
+        k.limit = 4
+        k.factor = .05
+
+        result = []
+        worker = threading.Thread(
+            target=lambda: result.append(k.get_all_ledgers(max_workers=4)),
+            daemon=True)
+        worker.start()
+        worker.join(timeout=10)
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(len(result[0]), 10)
+
+    def test_new_entries(self):
+        # a new entry arrives after the first page, shifting the offsets
+        results = self.api.results
+
+        def shifted(method, data):
+            page = results(method, data)
+            if 'ofs' not in data:
+                entry = dict(self.ledger[0][1], refid='R10',
+                             time=1500000010.5)
+                self.ledger.insert(0, ('L10', entry))
+            return page
+
+        self.api.results = shifted
+        ledgers = KrakenAPI(self.api, crl_sleep=0).get_all_ledgers()
+        self.assertEqual(sorted(ledgers.ledger_id),
+                         sorted('L{}'.format(i) for i in range(10)))
+
+    def test_empty_schema(self):
+        k = KrakenAPI(self.api, crl_sleep=0)
+        ledgers, count = k.get_ledgers_info()
+        empty = KrakenAPI(StubAPI(lambda method, data: {
+            'ledger': {}, 'count': 0}), crl_sleep=0).get_ledgers_info()[0]
+        self.assertTrue(empty.empty)
+        self.assertEqual(empty.index.dtype, ledgers.index.dtype)
+        self.assertEqual(empty.dtypes.to_dict(), ledgers.dtypes.to_dict())
+
+
+class Cached(object):
+    def __init__(self):
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @ttl_cache(.05)
+    def query(self, key):
+        self.calls += 1
+        return {'key': key, 'calls': self.calls}
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_and_expiry(self):
+        c = Cached()
+        self.assertEqual(c.query('a')['calls'], 1)
+        self.assertEqual(c.query('a')['calls'], 1)
+        self.assertEqual(c.query('b')['calls'], 2)
+        time.sleep(.06)
+        self.assertEqual(c.query('a')['calls'], 3)
+
+    def test_deep_copy(self):
+        c = Cached()
+        c.query('a')['key'] = 'modified'
+        self.assertEqual(c.query('a')['key'], 'a')
+
+    def test_eviction(self):
+        c = Cached()
+        c.query('a')
+        c.query('b')
+        time.sleep(.06)
+        c.query('c')
+        self.assertEqual([key[1] for key in c._cache], [('c',)])
+
+    def test_earn_strategies(self):
+        def results(method, data):
+            return {'next_cursor': None,
+                    'items': [{'id': 'S1', 'asset': 'DOT'}]}
+
+        api = StubAPI(results)
+        k = KrakenAPI(api, crl_sleep=0)
+        cursor, strategies = k.get_earn_strategies()
+        strategies.loc['S1', 'asset'] = 'modified'
+
+        cursor, strategies = k.get_earn_strategies()
+        self.assertEqual(len(api.queries), 1)
+        self.assertEqual(strategies.loc['S1', 'asset'], 'DOT')
+
+        k.get_earn_strategies(asset='DOT')
+        self.assertEqual(len(api.queries), 2)
+
+
 if __name__ == '__main__':
     unittest.main()